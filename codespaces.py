@@ -6,29 +6,66 @@
 #     "requests",
 #     "rich",
 #     "python-dotenv",
+#     "ciso8601",
+#     "orjson",
 # ]
 # ///
 
+import hashlib
 import json
+import operator
 import os
+import sys
+import tempfile
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import requests
 import typer
-from dotenv import load_dotenv
 from rich.console import Console
-from rich.table import Table
-from rich.text import Text
+
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = typer.Typer()
 console = Console()
 
-# Load environment variables from .env file in the script's directory
+UTC = timezone.utc
+
+# Color for each codespace state; anything else is shown in red
+_STATE_COLORS = {"available": "green", "shutdown": "yellow"}
+
+# Sort position for codespaces without an expiration date
+_FAR_FUTURE = datetime.max.replace(tzinfo=UTC)
+
+# .env file in the script's directory, loaded by _load_env()
 script_dir = Path(__file__).resolve().parent
 env_file = script_dir / ".env"
-load_dotenv(env_file)
+
+# Shared HTTP session: keeps the connection alive and retries transient errors
+GITHUB_API_URL = "https://api.github.com"
+REQUEST_TIMEOUT_SECONDS = 10
+
+_session = None
+
+# Cached API response, revalidated with ETag / If-None-Match
+cache_dir = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+cache_file = cache_dir / "codespaces-cli" / "user_codespaces.json"
+CACHE_TTL_SECONDS = 30
+
+def _load_env() -> None:
+    """Load environment variables from the .env file next to the script."""
+    from dotenv import load_dotenv
+
+    load_dotenv(env_file)
 
 
 def get_github_token(token: Optional[str] = None) -> str:
@@ -36,6 +73,10 @@ def get_github_token(token: Optional[str] = None) -> str:
     if token:
         return token
 
+    # Only read the .env file when the token isn't already exported
+    if not os.getenv("GITHUB_TOKEN"):
+        _load_env()
+
     token = os.getenv("GITHUB_TOKEN")
     if not token:
         console.print("[red]Error:[/red] No GitHub token provided.")
@@ -61,19 +102,115 @@ def get_github_token(token: Optional[str] = None) -> str:
     return token
 
 
-def fetch_codespaces(token: str) -> Dict[str, Any]:
-    """Fetch codespaces from GitHub API."""
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json",
+def _token_fingerprint(token: str) -> str:
+    """Hash the token so cached responses are tied to the account that fetched them."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def load_cache(token: str) -> Optional[Dict[str, Any]]:
+    """Load the cached API response for this token, if any."""
+    try:
+        cache = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict) or cache.get("token") != _token_fingerprint(token):
+        return None
+
+    return cache
+
+
+def save_cache(token: str, etag: str, body: Dict[str, Any]) -> None:
+    """Persist the API response and its ETag. Failures are ignored."""
+    cache = {
+        "token": _token_fingerprint(token),
+        "etag": etag,
+        "body": body,
+        "fetched_at": time.time(),
     }
 
+    # The cache holds the account's codespace inventory, so keep it private
+    # (mkstemp creates the file 0600) and swap it in atomically
+    try:
+        cache_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+    except OSError:
+        return
+
     try:
-        response = requests.get(
-            "https://api.github.com/user/codespaces", headers=headers
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_file)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _get_session():
+    """Create the shared requests session on first use."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        _session = requests.Session()
+        _session.mount(
+            "https://",
+            HTTPAdapter(
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=[502, 503, 504],
+                    raise_on_status=False,
+                )
+            ),
         )
+        _session.headers.update(
+            {
+                "Accept": "application/vnd.github.v3+json",
+                "User-Agent": "codespaces-cli",
+            }
+        )
+    return _session
+
+
+def fetch_codespaces(token: str) -> Dict[str, Any]:
+    """Fetch codespaces from GitHub API, using a conditional request when cached."""
+    headers = {"Authorization": f"token {token}"}
+
+    cache = load_cache(token)
+    if cache:
+        # Skip the round trip entirely for back-to-back invocations
+        age = time.time() - cache.get("fetched_at", 0)
+        if 0 <= age < CACHE_TTL_SECONDS:
+            return cache["body"]
+        headers["If-None-Match"] = cache["etag"]
+
+    import requests
+
+    try:
+        response = _get_session().get(
+            f"{GITHUB_API_URL}/user/codespaces",
+            headers=headers,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )
+
+        # Not modified: reuse the cached body (304s don't count against the rate limit)
+        if response.status_code == 304 and cache:
+            save_cache(token, cache["etag"], cache["body"])
+            return cache["body"]
+
         response.raise_for_status()
-        return response.json()
+        body = response.json()
+
+        etag = response.headers.get("ETag")
+        if etag:
+            save_cache(token, etag, body)
+
+        return body
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 401:
             console.print(
@@ -90,8 +227,21 @@ def fetch_codespaces(token: str) -> Dict[str, Any]:
         raise typer.Exit(1)
 
 
+def _iso_utc(s: str) -> str:
+    """Swap a trailing 'Z' for '+00:00' so datetime.fromisoformat accepts it."""
+    return s[:-1] + "+00:00" if s.endswith("Z") else s
+
+
+def _parse_iso(s: str) -> datetime:
+    """Parse an ISO-8601 timestamp as returned by the GitHub API."""
+    if ciso8601 is not None:
+        return ciso8601.parse_datetime(s)
+    return datetime.fromisoformat(_iso_utc(s))
+
+
 def calculate_expiration_info(
     codespace: Dict[str, Any],
+    now: datetime,
 ) -> tuple[Optional[datetime], Optional[str], str]:
     """Calculate expiration datetime, human-readable time, and color."""
     retention_expires_at = codespace.get("retention_expires_at")
@@ -99,8 +249,7 @@ def calculate_expiration_info(
     if not retention_expires_at:
         return None, None, "gray"
 
-    expires_dt = datetime.fromisoformat(retention_expires_at.replace("Z", "+00:00"))
-    now = datetime.now(timezone.utc)
+    expires_dt = _parse_iso(retention_expires_at)
 
     if expires_dt <= now:
         return expires_dt, "Expired", "red"
@@ -132,17 +281,6 @@ def calculate_expiration_info(
     return expires_dt, time_str, color
 
 
-def get_state_color(state: str) -> str:
-    """Get color for codespace state."""
-    state_lower = state.lower()
-    if state_lower == "available":
-        return "green"
-    elif state_lower == "shutdown":
-        return "yellow"
-    else:
-        return "red"
-
-
 def format_git_status(git_status: Dict[str, Any]) -> str:
     """Format git status into a readable string."""
     parts = []
@@ -165,41 +303,72 @@ def format_git_status(git_status: Dict[str, Any]) -> str:
     return ", ".join(parts) if parts else "clean"
 
 
+def annotate_codespaces(codespaces: List[Dict[str, Any]], now: datetime) -> None:
+    """Compute derived fields once per codespace and store them on the dict.
+
+    Derived keys start with an underscore, which no GitHub API field does,
+    so the JSON output can strip them by prefix.
+    """
+    for cs in codespaces:
+        expires_dt, expires_str, expires_color = calculate_expiration_info(cs, now)
+        state_lc = cs["state"].lower()
+
+        derived = {
+            # Expiration info
+            "_expires_dt": expires_dt,
+            "_expires_dt_sort": expires_dt or _FAR_FUTURE,
+            "_expires_str": expires_str,
+            "_expires_color": expires_color,
+            # Filter and state fields
+            "_repo_lc": cs["repository"]["name"].lower(),
+            "_state_lc": state_lc,
+            "_state_color": _STATE_COLORS.get(state_lc, "red"),
+        }
+        cs.update(derived)
+
+
+def _keep(
+    cs: Dict[str, Any],
+    repo_lc: Optional[str],
+    state_lc: Optional[str],
+    days: Optional[int],
+    now: datetime,
+) -> bool:
+    """Check a codespace against the filters, cheapest checks first."""
+    if state_lc and cs["_state_lc"] != state_lc:
+        return False
+
+    if repo_lc and repo_lc not in cs["_repo_lc"]:
+        return False
+
+    if days is not None:
+        expires_dt = cs["_expires_dt"]
+        if not expires_dt or (expires_dt - now).days > days:
+            return False
+
+    return True
+
+
 def filter_codespaces(
     codespaces: List[Dict[str, Any]],
+    now: datetime,
     days: Optional[int] = None,
     repo: Optional[str] = None,
     state: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """Filter codespaces based on criteria."""
-    filtered = codespaces
+    repo_lc = repo.lower() if repo else None
+    state_lc = state.lower() if state else None
 
-    if repo:
-        filtered = [
-            cs for cs in filtered if repo.lower() in cs["repository"]["name"].lower()
-        ]
-
-    if state:
-        filtered = [cs for cs in filtered if cs["state"].lower() == state.lower()]
-
-    if days is not None:
-        now = datetime.now(timezone.utc)
-        filtered_by_days = []
-
-        for cs in filtered:
-            expires_dt, _, _ = calculate_expiration_info(cs)
-            if expires_dt:
-                delta = expires_dt - now
-                if delta.days <= days:
-                    filtered_by_days.append(cs)
-
-        filtered = filtered_by_days
-
-    return filtered
+    return [cs for cs in codespaces if _keep(cs, repo_lc, state_lc, days, now)]
 
 
 def print_codespaces_table(codespaces: List[Dict[str, Any]]) -> None:
     """Print codespaces in a rich table format."""
+    # Only the table output needs these; keep them off the --json path
+    from rich.table import Table
+    from rich.text import Text
+
     if not codespaces:
         console.print("[yellow]No codespaces found matching your criteria.[/yellow]")
         return
@@ -214,38 +383,23 @@ def print_codespaces_table(codespaces: List[Dict[str, Any]]) -> None:
     table.add_column("Machine", style="dim")
     table.add_column("Git Status", style="dim")
 
-    # Add rows
+    # Add rows; format the table-only fields for the filtered rows alone
+    add_row = table.add_row
     for cs in codespaces:
-        # Get expiration info
-        expires_dt, expires_str, expires_color = calculate_expiration_info(cs)
-        expires_text = Text(expires_str or "Active", style=expires_color)
-
-        # Get state with color
-        state = cs["state"]
-        state_color = get_state_color(state)
-        state_text = Text(state, style=state_color)
-
-        # Format last used
         last_used = cs.get("last_used_at")
         if last_used:
-            last_used_dt = datetime.fromisoformat(last_used.replace("Z", "+00:00"))
-            last_used_str = last_used_dt.strftime("%Y-%m-%d")
+            last_used_str = _parse_iso(last_used).strftime("%Y-%m-%d")
         else:
             last_used_str = "Never"
 
-        # Format machine info
-        machine = cs.get("machine", {})
-        machine_str = machine.get("display_name", "Unknown")
+        machine_str = (cs.get("machine") or {}).get("display_name", "Unknown")
+        git_status_str = format_git_status(cs.get("git_status") or {})
 
-        # Format git status
-        git_status = cs.get("git_status", {})
-        git_status_str = format_git_status(git_status)
-
-        table.add_row(
+        add_row(
             cs["display_name"],
             cs["repository"]["name"],
-            state_text,
-            expires_text,
+            Text(cs["state"], style=cs["_state_color"]),
+            Text(cs["_expires_str"] or "Active", style=cs["_expires_color"]),
             last_used_str,
             machine_str,
             git_status_str,
@@ -255,15 +409,35 @@ def print_codespaces_table(codespaces: List[Dict[str, Any]]) -> None:
     console.print(f"\n[dim]Total: {len(codespaces)} codespace(s)[/dim]")
 
 
+def _json_default(obj: Any) -> Any:
+    """Serialize datetimes like orjson does when not using orjson."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 def print_codespaces_json(codespaces: List[Dict[str, Any]]) -> None:
     """Print codespaces as JSON."""
-    # Add calculated fields
+    output = []
     for cs in codespaces:
-        expires_dt, expires_str, _ = calculate_expiration_info(cs)
-        cs["_expires_in"] = expires_str
-        cs["_expires_timestamp"] = expires_dt.isoformat() if expires_dt else None
-
-    console.print_json(json.dumps(codespaces, indent=2))
+        # Drop internal annotations and add calculated fields
+        item = {k: v for k, v in cs.items() if not k.startswith("_")}
+        item["_expires_in"] = cs["_expires_str"]
+        item["_expires_timestamp"] = cs["_expires_dt"]
+        output.append(item)
+
+    # Highlight for humans at a terminal; write raw JSON when piped
+    if sys.stdout.isatty():
+        console.print_json(data=output, default=_json_default)
+    elif orjson is not None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b"\n")
+    else:
+        sys.stdout.write(
+            json.dumps(output, indent=2, ensure_ascii=False, default=_json_default)
+        )
+        sys.stdout.write("\n")
 
 
 @app.command()
@@ -314,17 +488,15 @@ def main(
         console.print("[yellow]No codespaces found.[/yellow]")
         raise typer.Exit(0)
 
+    # Compute derived fields once for all codespaces
+    now = datetime.now(UTC)
+    annotate_codespaces(codespaces, now)
+
     # Filter codespaces
-    filtered_codespaces = filter_codespaces(codespaces, days, repo, state)
+    filtered_codespaces = filter_codespaces(codespaces, now, days, repo, state)
 
     # Sort by expiration date (soonest first, None values last)
-    def sort_key(cs):
-        expires_dt, _, _ = calculate_expiration_info(cs)
-        if expires_dt is None:
-            return datetime.max.replace(tzinfo=timezone.utc)
-        return expires_dt
-
-    filtered_codespaces.sort(key=sort_key)
+    filtered_codespaces.sort(key=operator.itemgetter("_expires_dt_sort"))
 
     # Display results
     if json_output: